@@ -20,6 +20,11 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+try:
+    import orjson  # 可选依赖：更快的 JSON 序列化
+except ImportError:
+    orjson = None
+
 
 # ============================================================================
 # Windows 中文路径编码修复
@@ -34,6 +39,10 @@ def _fix_windows_encoding() -> None:
     if sys.platform != 'win32':
         return
     
+    # 已处于 UTF-8 模式或控制台已是 UTF-8 代码页时无需任何处理
+    if sys.flags.utf8_mode or (getattr(sys.stdout, 'encoding', None) or '').lower() in ('utf-8', 'utf8', 'cp65001'):
+        return
+    
     # 设置环境变量，确保 Python 使用 UTF-8
     os.environ.setdefault('PYTHONIOENCODING', 'utf-8')
     
@@ -74,6 +83,14 @@ def _fix_argv_encoding() -> None:
     if sys.platform != 'win32':
         return
     
+    # 纯 ASCII 参数不受代码页影响（str.isascii 为 C 层单次检查）
+    if all(a.isascii() for a in sys.argv):
+        return
+    
+    # 常见情况：参数均可正常编码且不含 0x80-0x9F（乱码特征），直接跳过
+    if all(_argv_is_clean(a) for a in sys.argv):
+        return
+    
     # 方法1: 使用 Windows API 直接获取 Unicode 命令行
     try:
         import ctypes
@@ -126,6 +143,25 @@ def _fix_argv_encoding() -> None:
         pass  # Windows API 调用失败，使用备选方案
 
 
+def _argv_is_clean(arg: str) -> bool:
+    """参数能正常编码为 UTF-8、不含 C1 控制字符（0x80-0x9F）且不像乱码"""
+    try:
+        arg.encode('utf-8')
+    except UnicodeEncodeError:
+        return False
+    if any('\x80' <= ch <= '\x9f' for ch in arg):
+        return False
+    return not _looks_like_garbled(arg)
+
+
+# 可疑字符删除表：控制字符（除 \t \n \r）、私用区字符、替换字符
+_SUSPICIOUS_TABLE: Dict[int, None] = dict.fromkeys(
+    [c for c in range(32) if c not in (9, 10, 13)]
+    + list(range(0xE000, 0xF900))
+    + [0xFFFD]
+)
+
+
 def _looks_like_garbled(s: str) -> bool:
     """检测字符串是否看起来像乱码
     
@@ -134,19 +170,8 @@ def _looks_like_garbled(s: str) -> bool:
     if not s:
         return False
     
-    # 统计可疑字符
-    suspicious_count = 0
-    for ch in s:
-        code = ord(ch)
-        # 替换字符
-        if code == 0xFFFD:
-            suspicious_count += 1
-        # 私用区字符
-        elif 0xE000 <= code <= 0xF8FF:
-            suspicious_count += 1
-        # 控制字符（除了常见的 \t \n \r）
-        elif code < 32 and code not in (9, 10, 13):
-            suspicious_count += 1
+    # 删除可疑字符后的长度差即可疑字符数（translate 在 C 层完成逐字符处理）
+    suspicious_count = len(s) - len(s.translate(_SUSPICIOUS_TABLE))
     
     # 如果超过 20% 的字符是可疑的，认为是乱码
     return suspicious_count > len(s) * 0.2
@@ -155,44 +180,67 @@ def _looks_like_garbled(s: str) -> bool:
 # 在模块加载时立即执行编码修复
 _fix_windows_encoding()
 
-from config_manager import ConfigManager
-from path_guard import normalize_and_validate_path, PathGuardError
-from doc_store import (
-    list_dir,
-    read_text_file,
-    upload_file,
-    search_documents,
-    search_by_query,
-    review_code,
-)
+# 注意：config_manager / path_guard / doc_store 均在使用处延迟导入，
+# 使 config 等轻量命令不必加载文档检索与 Review 相关模块，缩短冷启动时间。
+
+
+_RESP_TEMPLATE_COPY = {"schema_version": "1.0", "tool": None, "data": None}.copy
 
 
 def _ai_response(tool: str, data: Any) -> Dict[str, Any]:
-    return {
-        "schema_version": "1.0",
-        "tool": tool,
-        "data": data,
-    }
+    r = _RESP_TEMPLATE_COPY()
+    r["tool"] = tool
+    r["data"] = data
+    return r
+
+
+def _ok_data(data: Dict[str, Any], root_dir: str) -> Dict[str, Any]:
+    """原地补充 ok/root_dir 字段（结果中已有的同名字段优先），避免再构造一层 dict"""
+    data.setdefault("ok", True)
+    data.setdefault("root_dir", root_dir)
+    return data
+
+
+def _write_json(obj: Any, indent: bool = False) -> None:
+    """以 UTF-8 输出 JSON 到 stdout，优先使用 orjson，不可用时回退到 json"""
+    buf = None
+    out = getattr(sys.stdout, "buffer", None)
+    if orjson is not None and out is not None:
+        try:
+            buf = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            buf = None  # orjson 不支持的类型，交给 json 处理
+    if buf is None:
+        print(json.dumps(obj, ensure_ascii=False, indent=2 if indent else None))
+        return
+    # 先刷新文本层缓冲，保证与之前 print 的输出顺序一致
+    sys.stdout.flush()
+    out.write(buf + b"\n")
+    out.flush()
+
+
+def _write_lines(lines: List[str]) -> None:
+    """人类可读输出：拼接后一次写出，减少逐行 print 的系统调用/控制台写入"""
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _print_json(obj: Any) -> None:
     """输出 JSON 到 stdout
     
-    在 Windows 上，由于终端/管道可能使用非 UTF-8 编码捕获输出，
-    直接输出中文字符可能导致乱码。
+    在 Windows 控制台上，由于代码页可能不是 UTF-8，直接输出中文字符可能导致乱码。
     
-    解决方案：使用 ensure_ascii=True 输出 Unicode 转义序列 (\\uXXXX)，
+    解决方案：交互式终端（TTY）下使用 ensure_ascii=True 输出 Unicode 转义序列 (\\uXXXX)，
     JSON 解析器会自动将这些转义序列还原为正确的中文字符。
+    被管道/上层进程捕获时直接写出 UTF-8 字节（省去逐字符转义），调用方按 UTF-8 解码即可。
     """
-    if sys.platform == 'win32':
-        # Windows: 使用 ASCII 转义输出，避免任何编码问题
+    if sys.platform == 'win32' and sys.stdout.isatty():
+        # Windows 控制台: 使用 ASCII 转义输出，避免任何编码问题
         # 中文字符会被转义为 \uXXXX 形式
         json_str = json.dumps(obj, ensure_ascii=True)
         print(json_str)
     else:
-        # 非 Windows 系统，直接输出 UTF-8
-        json_str = json.dumps(obj, ensure_ascii=False)
-        print(json_str)
+        # 管道或非 Windows 系统，直接输出 UTF-8
+        _write_json(obj)
 
 
 @dataclass
@@ -202,16 +250,31 @@ class CommonArgs:
 
 class AICli:
     def __init__(self) -> None:
+        from config_manager import ConfigManager
+
         self.config = ConfigManager()
+        self._load_settings()
 
-    def _get_root_dir(self) -> str:
+    def _load_settings(self) -> None:
+        """一次性读取常用配置项，配置修改后需重新调用"""
         # 测试时允许覆盖 root_dir
-        test_root = self.config.get("test_root_dir")
-        if test_root:
-            return str(test_root)
-        return str(self.config.get("root_dir"))
+        self._root_dir = str(self.config.get("test_root_dir") or self.config.get("root_dir"))
+
+    def _int_setting(self, key: str) -> int:
+        """读取整数配置项；只在用到时转换，配置有误不影响 config show 等其他命令"""
+        value = self.config.get(key)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"配置项 {key} 不是有效整数: {value!r}") from None
+
+    def _get_root_dir(self) -> str:
+        return self._root_dir
 
     def cmd_list(self, args: argparse.Namespace) -> int:
+        from doc_store import list_dir
+        from path_guard import PathGuardError
+
         ai_mode = bool(args.ai_mode)
         root_dir = self._get_root_dir()
 
@@ -231,24 +294,29 @@ class AICli:
             return 1
 
         if ai_mode:
-            _print_json(_ai_response("shared_drive.list", {"ok": True, "root_dir": root_dir, **result}))
+            _print_json(_ai_response("shared_drive.list", _ok_data(result, root_dir)))
         else:
-            print(f"Root: {root_dir}")
-            print(f"Dir:  {result['path']}")
+            out = [f"Root: {root_dir}", f"Dir:  {result['path']}"]
             for it in result["items"]:
                 t = "DIR " if it["is_dir"] else "FILE"
-                print(f"{t}  {it['name']}  {it.get('size_bytes','-')}  {it.get('mtime','-')}")
+                out.append(f"{t}  {it['name']}  {it.get('size_bytes','-')}  {it.get('mtime','-')}")
+            _write_lines(out)
         return 0
 
     def cmd_read(self, args: argparse.Namespace) -> int:
+        from doc_store import read_text_file
+        from path_guard import PathGuardError
+
         ai_mode = bool(args.ai_mode)
         root_dir = self._get_root_dir()
 
-        max_bytes = int(self.config.get("max_read_bytes"))
-        max_lines = int(self.config.get("max_read_lines"))
-
         try:
-            data = read_text_file(root_dir, args.file, max_bytes=max_bytes, max_lines=max_lines)
+            data = read_text_file(
+                root_dir,
+                args.file,
+                max_bytes=self._int_setting("max_read_bytes"),
+                max_lines=self._int_setting("max_read_lines"),
+            )
         except PathGuardError as e:
             if ai_mode:
                 _print_json(_ai_response("shared_drive.read", {"ok": False, "error": str(e)}))
@@ -263,7 +331,7 @@ class AICli:
             return 1
 
         if ai_mode:
-            _print_json(_ai_response("shared_drive.read", {"ok": True, "root_dir": root_dir, **data}))
+            _print_json(_ai_response("shared_drive.read", _ok_data(data, root_dir)))
         else:
             print(f"Path: {data['path']}")
             if data.get("truncated"):
@@ -272,18 +340,19 @@ class AICli:
         return 0
 
     def cmd_upload(self, args: argparse.Namespace) -> int:
+        from doc_store import upload_file
+        from path_guard import PathGuardError
+
         ai_mode = bool(args.ai_mode)
         root_dir = self._get_root_dir()
 
-        upload_max_bytes = int(self.config.get("upload_max_bytes"))
-
         try:
             data = upload_file(
                 root_dir=root_dir,
                 dest_rel_path=args.dest,
                 local_file=args.from_file,
                 conflict=args.conflict,
-                upload_max_bytes=upload_max_bytes,
+                upload_max_bytes=self._int_setting("upload_max_bytes"),
             )
         except PathGuardError as e:
             if ai_mode:
@@ -299,7 +368,7 @@ class AICli:
             return 1
 
         if ai_mode:
-            _print_json(_ai_response("shared_drive.upload", {"ok": True, "root_dir": root_dir, **data}))
+            _print_json(_ai_response("shared_drive.upload", _ok_data(data, root_dir)))
         else:
             print(f"OK: {data['final_path']}")
             print(f"Size: {data['size_bytes']} bytes")
@@ -310,6 +379,9 @@ class AICli:
 
     def cmd_search(self, args: argparse.Namespace) -> int:
         """搜索共享盘文档"""
+        from doc_store import search_documents, search_by_query
+        from path_guard import PathGuardError
+
         ai_mode = bool(args.ai_mode)
         root_dir = self._get_root_dir()
 
@@ -346,17 +418,19 @@ class AICli:
             return 1
 
         if ai_mode:
-            _print_json(_ai_response("shared_drive.search", {"ok": True, "root_dir": root_dir, **result}))
+            _print_json(_ai_response("shared_drive.search", _ok_data(result, root_dir)))
         else:
-            print(f"Root: {root_dir}")
-            print(f"Search Dir: {result.get('search_dir', '.')}")
-            print(f"Keywords: {result.get('keywords', [])}")
-            print(f"Total Found: {result.get('total_found', 0)}")
-            print("-" * 60)
+            out = [
+                f"Root: {root_dir}",
+                f"Search Dir: {result.get('search_dir', '.')}",
+                f"Keywords: {result.get('keywords', [])}",
+                f"Total Found: {result.get('total_found', 0)}",
+                "-" * 60,
+            ]
             
             for i, item in enumerate(result.get("results", []), 1):
-                print(f"\n[{i}] {item['path']}")
-                print(f"    Score: {item['score']:.1f}  Size: {item['size_bytes']} bytes")
+                out.append(f"\n[{i}] {item['path']}")
+                out.append(f"    Score: {item['score']:.1f}  Size: {item['size_bytes']} bytes")
                 for match in item.get("matches", []):
                     match_types = []
                     if match.get("name_match"):
@@ -365,20 +439,23 @@ class AICli:
                         match_types.append("目录名")
                     if match.get("content_match"):
                         match_types.append("内容")
-                    print(f"    - '{match['keyword']}' 匹配: {', '.join(match_types)}")
+                    out.append(f"    - '{match['keyword']}' 匹配: {', '.join(match_types)}")
                     if "snippet" in match:
                         snippet = match["snippet"]
-                        print(f"      Line {snippet.get('line', '?')}: {snippet.get('snippet', '')[:100]}")
+                        out.append(f"      Line {snippet.get('line', '?')}: {snippet.get('snippet', '')[:100]}")
             
             if result.get("suggestions"):
-                print("\n建议:")
+                out.append("\n建议:")
                 for sug in result["suggestions"]:
-                    print(f"  • {sug}")
+                    out.append(f"  • {sug}")
+            _write_lines(out)
         
         return 0
 
     def cmd_review(self, args: argparse.Namespace) -> int:
         """基于项目规范进行代码 Review"""
+        from doc_store import review_code
+
         ai_mode = bool(args.ai_mode)
         root_dir = self._get_root_dir()
 
@@ -469,21 +546,22 @@ class AICli:
             _print_json(_ai_response("shared_drive.review", result))
         else:
             if not result.get("ok"):
-                print(f"✗ {result.get('error', '未知错误')}")
+                out = [f"✗ {result.get('error', '未知错误')}"]
                 if result.get("suggestions"):
-                    print("\n建议:")
+                    out.append("\n建议:")
                     for sug in result["suggestions"]:
-                        print(f"  • {sug}")
+                        out.append(f"  • {sug}")
+                _write_lines(out)
                 return 1
             
-            # 打印格式化的报告
-            print(result.get("formatted_report", ""))
-            
-            # 打印使用的规范信息
+            # 格式化的报告 + 使用的规范信息
             standards = result.get("standards_used", {})
-            print("\n---")
-            print(f"使用的规范文档: {len(standards.get('documents', []))} 个")
-            print(f"检查规则数: {standards.get('rules_count', 0)} 条")
+            _write_lines([
+                result.get("formatted_report", ""),
+                "\n---",
+                f"使用的规范文档: {len(standards.get('documents', []))} 个",
+                f"检查规则数: {standards.get('rules_count', 0)} 条",
+            ])
 
         return 0 if result.get("ok") else 1
 
@@ -493,11 +571,12 @@ class AICli:
             if args.ai_mode:
                 _print_json(_ai_response("shared_drive.config.show", {"ok": True, "config": cfg}))
             else:
-                print(json.dumps(cfg, ensure_ascii=False, indent=2))
+                _write_json(cfg, indent=True)
             return 0
 
         if args.config_cmd == "set-root":
             self.config.set("root_dir", args.path)
+            self._load_settings()
             if args.ai_mode:
                 _print_json(_ai_response("shared_drive.config.set_root", {"ok": True, "root_dir": args.path}))
             else:
@@ -506,6 +585,7 @@ class AICli:
 
         if args.config_cmd == "set-test-root":
             self.config.set("test_root_dir", args.path)
+            self._load_settings()
             if args.ai_mode:
                 _print_json(_ai_response("shared_drive.config.set_test_root", {"ok": True, "test_root_dir": args.path}))
             else:
@@ -516,7 +596,18 @@ class AICli:
         return 1
 
 
+_PARSER: Optional[argparse.ArgumentParser] = None
+
+
 def build_parser() -> argparse.ArgumentParser:
+    """返回模块级缓存的解析器（首次调用时构建）"""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = _build_parser()
+    return _PARSER
+
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="S1SharedDocSkill CLI",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -579,7 +670,21 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _fast_config_show_args(argv: List[str]) -> Optional[argparse.Namespace]:
+    """`config show [--ai-mode]` 是最常见的自检命令，跳过构建完整解析器"""
+    if len(argv) < 2 or argv[0] != "config" or argv[1] != "show":
+        return None
+    rest = argv[2:]
+    if any(a != "--ai-mode" for a in rest):
+        return None  # 其他参数（如 -h）交给 argparse 处理
+    return argparse.Namespace(command="config", config_cmd="show", ai_mode=bool(rest))
+
+
 def main() -> int:
+    fast_args = _fast_config_show_args(sys.argv[1:])
+    if fast_args is not None:
+        return AICli().cmd_config(fast_args)
+
     parser = build_parser()
     args = parser.parse_args()
 
@@ -589,21 +694,18 @@ def main() -> int:
 
     cli = AICli()
 
-    if args.command == "list":
-        return cli.cmd_list(args)
-    if args.command == "read":
-        return cli.cmd_read(args)
-    if args.command == "upload":
-        return cli.cmd_upload(args)
-    if args.command == "config":
-        return cli.cmd_config(args)
-    if args.command == "search":
-        return cli.cmd_search(args)
-    if args.command == "review":
-        return cli.cmd_review(args)
-
-    print("✗ 未知命令", file=sys.stderr)
-    return 1
+    handler = {
+        "list": cli.cmd_list,
+        "read": cli.cmd_read,
+        "upload": cli.cmd_upload,
+        "config": cli.cmd_config,
+        "search": cli.cmd_search,
+        "review": cli.cmd_review,
+    }.get(args.command)
+    if handler is None:
+        print("✗ 未知命令", file=sys.stderr)
+        return 1
+    return handler(args)
 
 
 if __name__ == "__main__":
@@ -3,9 +3,16 @@
 
 from __future__ import annotations
 
+import copy
 import json
+import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
+
+
+# get() 的哨兵值：区分“键不存在”和“值为 None”
+_MISSING = object()
 
 
 class ConfigManager:
@@ -16,6 +23,8 @@ class ConfigManager:
             self.config_path = Path(__file__).parent / "user_config.json"
 
         self._config: Dict[str, Any] = {}
+        self._dirty = False
+        self._deferred = False
         self._load()
 
     def _default_config(self) -> Dict[str, Any]:
@@ -49,25 +58,46 @@ class ConfigManager:
         self._config = cfg
 
     def _save(self) -> None:
-        self.config_path.write_text(json.dumps(self._config, ensure_ascii=False, indent=2), encoding="utf-8")
+        # 先写临时文件再原子替换，避免并发读取到写了一半的配置
+        tmp_path = self.config_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(self._config, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.config_path)
+        self._dirty = False
 
     def _deep_merge(self, base: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
-        out = dict(base)
-        for k, v in patch.items():
-            if isinstance(v, dict) and isinstance(out.get(k), dict):
-                out[k] = self._deep_merge(out[k], v)
-            else:
-                out[k] = v
+        # 仅整体复制一次 base，然后用显式栈原地合并各层，避免递归和逐层 dict 复制
+        out = copy.deepcopy(base)
+        stack = [(out, patch)]
+        while stack:
+            o, p = stack.pop()
+            for k, v in p.items():
+                if isinstance(v, dict) and isinstance(o.get(k), dict):
+                    stack.append((o[k], v))
+                else:
+                    o[k] = v
         return out
 
     def get(self, key: str, default: Any = None) -> Any:
-        if key in self._config:
-            return self._config[key]
-        return default
+        v = self._config.get(key, _MISSING)
+        return default if v is _MISSING else v
 
     def set(self, key: str, value: Any) -> None:
         self._config[key] = value
-        self._save()
+        self._dirty = True
+        if not self._deferred:
+            self._save()
+
+    @contextmanager
+    def batch(self) -> Iterator["ConfigManager"]:
+        """批量修改配置：期间的 set() 只更新内存，退出时统一写盘一次"""
+        outer = self._deferred
+        self._deferred = True
+        try:
+            yield self
+        finally:
+            self._deferred = outer
+            if not outer and self._dirty:
+                self._save()
 
     def get_all(self) -> Dict[str, Any]:
         return dict(self._config)
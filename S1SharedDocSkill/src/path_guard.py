@@ -93,12 +93,14 @@ def _detect_path_issues(user_path: str) -> Optional[str]:
     return None
 
 
-def normalize_and_validate_path(root_dir: str, user_path: str) -> Path:
+def normalize_and_validate_path(root_dir: str, user_path: str, root_real: Optional[str] = None) -> Path:
     """将用户提供的相对路径规范化为 root_dir 下的真实路径，并校验不越权。
 
     Args:
         root_dir: 根目录路径（共享盘根目录）
         user_path: 用户提供的相对路径（或 '.'）
+        root_real: 调用方已解析的根目录 realpath（如 DocStore 初始化时计算一次）；
+            不提供时每次调用都重新解析，根目录符号链接被改指后立即生效
 
     Returns:
         规范化后的绝对路径 Path 对象
@@ -114,10 +116,10 @@ def normalize_and_validate_path(root_dir: str, user_path: str) -> Path:
         - Windows 下进行大小写不敏感比较
     """
 
-    root = Path(root_dir)
     # root 允许不存在（比如测试初始化之前），但会在实际访问时由调用方处理
-    root_abs = Path(os.path.abspath(str(root)))
-    root_real = Path(os.path.realpath(str(root_abs)))
+    root_abs_str = os.path.abspath(root_dir)
+    root_abs = Path(root_abs_str)
+    root_real_path = Path(root_real if root_real is not None else os.path.realpath(root_abs_str))
 
     if user_path is None:
         user_path = "."
@@ -158,7 +160,7 @@ def normalize_and_validate_path(root_dir: str, user_path: str) -> Path:
 
     # 防符号链接越界：比较 realpath
     combined_real = Path(os.path.realpath(str(combined_abs)))
-    if not _is_same_or_child_path(combined_real, root_real):
+    if not _is_same_or_child_path(combined_real, root_real_path):
         raise PathNotAllowedError(
             f"越权路径：符号链接导致越界 '{user_path}' (root={root_dir})。"
             f"符号链接指向了根目录外的位置。"
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""AI 命令行入口测试
+
+测试覆盖：
+1. 数值配置项有误时 config show / list 仍可用
+2. 用到有误配置项的命令返回错误结果而不是抛出异常
+"""
+
+import io
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import ai_cli
+import config_manager
+
+
+class TestMalformedNumericConfig(unittest.TestCase):
+    """数值配置项格式错误测试"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="test_cli_")
+        docs_dir = Path(self.temp_dir) / "docs"
+        docs_dir.mkdir()
+        (docs_dir / "readme.txt").write_text("Hello", encoding="utf-8")
+
+        self.config_path = Path(self.temp_dir) / "user_config.json"
+        self.config_path.write_text(
+            json.dumps({"root_dir": self.temp_dir, "max_read_bytes": "256k"}), encoding="utf-8"
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, *argv):
+        """经 main() 执行命令，返回 (退出码, 输出的 JSON)"""
+        out = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        manager = config_manager.ConfigManager(str(self.config_path))
+        with mock.patch.object(sys, "argv", ["ai_cli.py", *argv]), \
+                mock.patch.object(sys, "stdout", out), \
+                mock.patch.object(config_manager, "ConfigManager", return_value=manager):
+            code = ai_cli.main()
+        out.flush()
+        return code, json.loads(out.buffer.getvalue().decode("utf-8"))
+
+    def test_config_show_with_malformed_number(self):
+        """测试数值配置项有误时 config show 仍正常输出"""
+        code, resp = self._run("config", "show", "--ai-mode")
+        self.assertEqual(code, 0)
+        self.assertEqual(resp["data"]["config"]["max_read_bytes"], "256k")
+
+        code, resp = self._run("list", "docs", "--ai-mode")
+        self.assertEqual(code, 0)
+        self.assertEqual([it["name"] for it in resp["data"]["items"]], ["readme.txt"])
+
+    def test_read_reports_malformed_number(self):
+        """测试读取文件时报告有误的配置项"""
+        code, resp = self._run("read", "docs/readme.txt", "--ai-mode")
+        self.assertEqual(code, 1)
+        self.assertFalse(resp["data"]["ok"])
+        self.assertIn("max_read_bytes", resp["data"]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
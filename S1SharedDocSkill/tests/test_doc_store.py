@@ -11,16 +11,20 @@
 """
 
 import json
+import mmap
 import os
 import sys
 import tempfile
 import unittest
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from unittest import mock
 
 # 添加 src 目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from doc_store import DocStore
+import doc_store
+from doc_store import DocStore, StandardChecklist, StandardRule, locate_standard_documents
 
 
 class TestDocStoreList(unittest.TestCase):
@@ -92,6 +96,39 @@ class TestDocStoreList(unittest.TestCase):
         result = self.store.list_dir("docs/readme.txt")
         self.assertFalse(result["success"])
 
+    def test_list_cache_isolated_from_caller(self):
+        """测试缓存命中时返回副本，调用方修改不影响后续结果"""
+        first = self.store.list_dir("docs")
+        first["items"].clear()
+        second = self.store.list_dir("docs")
+        self.assertTrue(second["success"])
+        self.assertEqual(len(second["items"]), 3)
+
+    def test_list_cache_invalidated_on_upload(self):
+        """测试上传后目录列表缓存失效"""
+        self.store.list_dir("docs")
+        self.store.upload_file("docs/new.txt", "new")
+        names = [item["name"] for item in self.store.list_dir("docs")["items"]]
+        self.assertIn("new.txt", names)
+
+    def test_list_cache_path_relative_to_each_root(self):
+        """测试同一目录经不同根目录列出时，缓存命中仍按各自根目录返回相对路径"""
+        self.assertEqual(self.store.list_dir("docs/子目录")["path"], "docs/子目录")
+        sub_store = DocStore(root_dir=str(Path(self.temp_dir) / "docs"))
+        self.assertEqual(sub_store.list_dir("子目录")["path"], "子目录")
+
+    def test_list_parallel_stat_matches_serial(self):
+        """测试远程路径下并发 stat 的结果与串行一致"""
+        many_dir = Path(self.temp_dir) / "many"
+        many_dir.mkdir()
+        for i in range(doc_store.PARALLEL_STAT_MIN_ENTRIES + 8):
+            (many_dir / f"f{i:03d}.txt").write_text("x" * i, encoding="utf-8")
+
+        serial = DocStore(root_dir=self.temp_dir, list_cache_ttl=0).list_dir("many")
+        with mock.patch.object(doc_store, "_is_remote_path", return_value=True):
+            parallel = DocStore(root_dir=self.temp_dir, list_cache_ttl=0).list_dir("many")
+        self.assertEqual(serial["items"], parallel["items"])
+
 
 class TestDocStoreRead(unittest.TestCase):
     """文件读取功能测试"""
@@ -133,6 +170,47 @@ class TestDocStoreRead(unittest.TestCase):
         lines = result["content"].split("\n")
         self.assertLessEqual(len(lines), 101)  # 可能有末尾空行
 
+    def test_read_truncated_at_line_boundary(self):
+        """测试按行数/字节数截断时保留完整行"""
+        result = self.store.read_file("docs/large.txt", max_lines=3)
+        self.assertTrue(result["truncated"])
+        self.assertEqual(result["read_lines"], 3)
+        self.assertEqual(result["content"], "Line 0\nLine 1\nLine 2\n")
+
+        result = self.store.read_file("docs/large.txt", max_bytes=20)
+        self.assertTrue(result["truncated"])
+        self.assertEqual(result["content"], "Line 0\nLine 1\n")
+
+        # 跨越上限的那一行不返回
+        (Path(self.temp_dir) / "docs" / "long.txt").write_text("line1\n" + "y" * 50 + "\n", encoding="utf-8")
+        self.assertEqual(self.store.read_file("docs/long.txt", max_bytes=40)["content"], "line1\n")
+
+    def test_read_long_line_cut_at_char_boundary(self):
+        """测试首行即超过字节上限时按上限截断到完整字符"""
+        (Path(self.temp_dir) / "docs" / "cjk.txt").write_text("中文" * 30, encoding="utf-8")
+        result = self.store.read_file("docs/cjk.txt", max_bytes=10)
+        self.assertTrue(result["truncated"])
+        self.assertEqual(result["content"], "中文中")
+        self.assertEqual(result["read_bytes"], 9)
+
+    def test_read_mmap_large_file(self):
+        """测试超过 mmap 阈值的文件截断结果与普通读取一致"""
+        content = "".join(f"第 {i} 行\n" for i in range(20000))
+        (Path(self.temp_dir) / "docs" / "huge.txt").write_text(content, encoding="utf-8")
+
+        result = self.store.read_file("docs/huge.txt", max_bytes=100 * 1024, max_lines=10000)
+        self.assertTrue(result["truncated"])
+        self.assertTrue(result["content"].endswith("\n"))
+        self.assertTrue(content.startswith(result["content"]))
+
+        old_min = doc_store.MMAP_MIN_BYTES
+        doc_store.MMAP_MIN_BYTES = 1 << 40
+        try:
+            plain = self.store.read_file("docs/huge.txt", max_bytes=100 * 1024, max_lines=10000)
+        finally:
+            doc_store.MMAP_MIN_BYTES = old_min
+        self.assertEqual(result["content"], plain["content"])
+
     def test_read_with_offset(self):
         """测试偏移读取"""
         # 先测试正常读取
@@ -143,7 +221,10 @@ class TestDocStoreRead(unittest.TestCase):
         # 偏移读取功能测试（验证功能可用即可）
         result2 = self.store.read_file("docs/large.txt", offset=5, max_lines=10)
         self.assertTrue(result2["success"])
-        # 只要能成功执行就算通过
+        # 偏移在读取范围（前 10 行）内生效，超出范围时内容为空
+        self.assertEqual(result2["content"], "\n".join(lines[5:10]) + "\n")
+        result3 = self.store.read_file("docs/large.txt", offset=20, max_lines=10)
+        self.assertEqual(result3["content"], "")
 
     def test_read_nonexistent(self):
         """测试读取不存在的文件"""
@@ -174,7 +255,7 @@ class TestDocStoreUpload(unittest.TestCase):
         result = self.store.upload_file("uploads/new.txt", content)
         
         self.assertTrue(result["success"])
-        self.assertIn("path", result)
+        self.assertEqual(result["path"], "uploads/new.txt")
         
         # 验证文件已创建
         file_path = Path(self.temp_dir) / "uploads" / "new.txt"
@@ -300,6 +381,173 @@ class TestDocStoreSearch(unittest.TestCase):
         self.assertTrue(result["success"])
         self.assertLessEqual(len(result["results"]), 1)
 
+    def _search_tracking_reads(self, keywords):
+        """经 search_documents 检索，同时记录各文件实际读取的内容 (类型, 长度)"""
+        reads = []
+        read_and_locate = doc_store._read_and_locate
+
+        def track(*args, **kwargs):
+            raw, positions = read_and_locate(*args, **kwargs)
+            reads.append((type(raw), len(raw)))
+            return raw, positions
+
+        with mock.patch.object(doc_store, "_read_and_locate", side_effect=track):
+            result = doc_store.search_documents(self.temp_dir, keywords, top_k=50)
+        return result, reads
+
+    def _snippet_lines(self, result, path):
+        item = next(r for r in result["results"] if r["path"] == path)
+        return {m["keyword"]: m["snippet"]["line"] for m in item["matches"] if m.get("snippet")}
+
+    def test_keyword_positions_match_fallback(self):
+        """测试多关键词一次定位（自动机）与逐个 find 的结果一致"""
+        keywords = ["python", "命名", "PYTHON", "不存在"]
+        result = doc_store.search_documents(self.temp_dir, keywords)
+        self.assertEqual(
+            self._snippet_lines(result, "docs/python_guide.md"), {"python": 1, "命名": 5, "PYTHON": 1}
+        )
+        with mock.patch.object(doc_store, "ahocorasick", None):
+            self.assertEqual(doc_store.search_documents(self.temp_dir, keywords), result)
+
+    def test_line_numbers_incremental(self):
+        """测试多处命中的行号与逐个从头计数一致"""
+        (Path(self.temp_dir) / "docs" / "lines.txt").write_text("a\nbb\n\nccc\ndd", encoding="utf-8")
+        result = doc_store.search_documents(self.temp_dir, ["ccc", "bb", "dd"])
+        self.assertEqual(self._snippet_lines(result, "docs/lines.txt"), {"ccc": 4, "bb": 2, "dd": 5})
+
+    def test_search_stops_reading_after_all_hits(self):
+        """测试全部关键词命中后提前停止读取，片段仍保留后续上下文"""
+        content = "Alpha 开头 trailing context\n" + "filler line\n" * 40000
+        (Path(self.temp_dir) / "docs" / "long.txt").write_text(content, encoding="utf-8")
+        with mock.patch.object(doc_store, "MMAP_MIN_BYTES", sys.maxsize):
+            result, reads = self._search_tracking_reads(["alpha", "开头"])
+        self.assertLess(max(n for _, n in reads), len(content.encode("utf-8")))
+
+        snippet = result["results"][0]["matches"][0]["snippet"]
+        self.assertEqual(snippet["line"], 1)
+        self.assertIn("Alpha 开头 trailing context", snippet["snippet"])
+
+    def test_search_large_file_uses_mmap(self):
+        """测试大文件检索走 mmap 映射，结果与整块读取一致"""
+        big = Path(self.temp_dir) / "docs" / "big.log"
+        big.write_text("filler line\n" * 20000 + "Needle 命中\n", encoding="utf-8")
+        result, reads = self._search_tracking_reads(["needle"])
+        self.assertIn(mmap.mmap, [kind for kind, _ in reads])
+
+        snippet = result["results"][0]["matches"][0]["snippet"]
+        self.assertEqual(snippet["line"], 20001)
+        self.assertIn("Needle 命中", snippet["snippet"])
+        with mock.patch.object(doc_store, "MMAP_MIN_BYTES", sys.maxsize):
+            self.assertEqual(doc_store.search_documents(self.temp_dir, ["needle"], top_k=50), result)
+
+    def test_search_skips_binary_content(self):
+        """测试开头含 NUL 的文件不做内容匹配，文件名匹配不受影响"""
+        blob = Path(self.temp_dir) / "docs" / "dump.log"
+        blob.write_bytes(b"\x00\x01\x02" * 2000 + b"needle")
+        result = self.store.search("needle", include_content=True)
+        self.assertEqual([r["path"] for r in result["results"]], [])
+
+        result = self.store.search("dump", include_content=True)
+        self.assertEqual(len(result["results"]), 1)
+        self.assertFalse(result["results"][0]["matches"][0]["content_match"])
+
+    def test_search_prefetch_matches_serial(self):
+        """测试网络盘预读检索、线程池检索与串行检索结果一致"""
+        # 文件很少时串行检索
+        with mock.patch.object(doc_store, "_search_files_threaded") as threaded:
+            self.assertEqual(len(doc_store.search_documents(self.temp_dir, ["命名"])["results"]), 2)
+        threaded.assert_not_called()
+
+        for i in range(40):
+            (Path(self.temp_dir) / "docs" / f"note{i}.txt").write_text(
+                f"第 {i} 号\n" + ("命名 约定\n" if i % 3 == 0 else "其他\n"), encoding="utf-8"
+            )
+        with mock.patch.object(doc_store, "PARALLEL_STAT_MIN_ENTRIES", sys.maxsize):
+            serial = doc_store.search_documents(self.temp_dir, ["命名", "约定"], top_k=50)
+        with mock.patch.object(doc_store, "_is_remote_path", return_value=True), \
+                mock.patch.object(doc_store, "_search_files_prefetched",
+                                  wraps=doc_store._search_files_prefetched) as prefetched:
+            remote = doc_store.search_documents(self.temp_dir, ["命名", "约定"], top_k=50)
+        prefetched.assert_called_once()
+        self.assertEqual(remote, serial)
+
+        # 本地盘上未达进程池阈值时走线程池，结果同样一致
+        with mock.patch.object(doc_store, "_search_files_threaded",
+                               wraps=doc_store._search_files_threaded) as threaded:
+            local = doc_store.search_documents(self.temp_dir, ["命名", "约定"], top_k=50)
+        threaded.assert_called_once()
+        self.assertEqual(local, serial)
+
+    def test_search_process_pool_errors(self):
+        """测试进程池无法创建或运行中失败时退回其他检索方式，结果与串行检索一致"""
+        for i in range(210):
+            (Path(self.temp_dir) / "docs" / f"pool{i}.txt").write_text(
+                "命名 约定\n" if i % 7 == 0 else "其他\n", encoding="utf-8"
+            )
+        with mock.patch.object(doc_store, "PARALLEL_SEARCH_MIN_FILES", sys.maxsize), \
+                mock.patch.object(doc_store, "PARALLEL_STAT_MIN_ENTRIES", sys.maxsize):
+            serial = doc_store.search_documents(self.temp_dir, ["命名", "pool"], top_k=300)
+        self.assertGreater(serial["total_found"], 200)
+
+        with mock.patch.object(doc_store.os, "cpu_count", return_value=2), \
+                mock.patch("concurrent.futures.ProcessPoolExecutor", side_effect=NotImplementedError):
+            self.assertEqual(doc_store.search_documents(self.temp_dir, ["命名", "pool"], top_k=300), serial)
+
+        with mock.patch.object(doc_store.os, "cpu_count", return_value=2), \
+                mock.patch("concurrent.futures.ProcessPoolExecutor") as pool:
+            pool.return_value.map.side_effect = BrokenProcessPool("worker died")
+            self.assertEqual(doc_store.search_documents(self.temp_dir, ["命名", "pool"], top_k=300), serial)
+        pool.return_value.map.assert_called_once()
+
+    def test_search_prunes_skipped_dirs(self):
+        """测试检索跳过依赖/构建目录，并支持自定义剪枝回调"""
+        for name in ("node_modules", "archive"):
+            sub = Path(self.temp_dir) / "docs" / name
+            sub.mkdir()
+            (sub / "pruned.md").write_text("prunetarget", encoding="utf-8")
+
+        result = doc_store.search_documents(self.temp_dir, ["prunetarget"])
+        self.assertEqual([r["path"] for r in result["results"]], ["docs/archive/pruned.md"])
+
+        result = doc_store.search_documents(
+            self.temp_dir, ["prunetarget"], prune_fn=lambda name: name == "archive"
+        )
+        self.assertEqual(result["results"], [])
+
+    def test_answer_nested_dirs_traverse_once(self):
+        """测试嵌套的搜索目录只遍历一次，各目录的结果与单独检索一致"""
+        (Path(self.temp_dir) / "notes.md").write_text("命名 随笔", encoding="utf-8")
+        separate = [
+            doc_store.search_by_query(self.temp_dir, "命名", search_dir=d, top_k=5)
+            for d in (".", "docs")
+        ]
+
+        with mock.patch.object(
+            doc_store, "_collect_search_candidates", wraps=doc_store._collect_search_candidates
+        ) as spy:
+            answer = doc_store.answer_from_documents(self.temp_dir, "命名", [".", "docs"], top_k=5)
+        self.assertEqual(spy.call_count, 1)
+
+        history = answer["context_summary"]["search_history"]
+        self.assertEqual([h["result_count"] for h in history], [r["total_found"] for r in separate])
+        self.assertEqual(answer["total_found"], 3)
+
+    def test_search_dir_match_only_below_root(self):
+        """测试目录名匹配只考虑根目录以下的目录"""
+        root_name = Path(self.temp_dir).name
+        result = self.store.search(root_name)
+        self.assertEqual(result["results"], [])
+
+        result = self.store.search("docs")
+        self.assertGreater(len(result["results"]), 0)
+
+    def test_search_non_ascii_case_insensitive(self):
+        """测试含非 ASCII 大小写字母的关键词仍按 Unicode 规则不区分大小写"""
+        (Path(self.temp_dir) / "docs" / "cafe.txt").write_text("CAFÉ 菜单", encoding="utf-8")
+        result = self.store.search("café", include_content=True)
+        paths = [r["path"] for r in result["results"]]
+        self.assertIn("docs/cafe.txt", paths)
+
 
 class TestDocStoreStandards(unittest.TestCase):
     """规范定位与提炼测试"""
@@ -351,6 +599,13 @@ class TestDocStoreStandards(unittest.TestCase):
         self.assertTrue(result["success"])
         self.assertGreater(len(result["files"]), 0)
 
+    def test_locate_standards_stops_at_max_results(self):
+        """测试找满 max_results 个文档后停止遍历，但仍报告不可访问的路径"""
+        result = locate_standard_documents(self.temp_dir, custom_paths=["规范", "../外部"], max_results=1)
+        self.assertEqual(len(result["documents"]), 1)
+        self.assertEqual(result["total_found"], 1)
+        self.assertEqual(result["inaccessible_paths"], ["../外部"])
+
     def test_extract_checklist(self):
         """测试提取检查清单"""
         result = self.store.extract_checklist()
@@ -358,6 +613,60 @@ class TestDocStoreStandards(unittest.TestCase):
         self.assertIn("checklist", result)
         self.assertIsInstance(result["checklist"], list)
 
+    def test_extract_checklist_skips_binary_formats(self):
+        """测试二进制格式的规范文档不做文本解析，直接返回提示"""
+        (Path(self.temp_dir) / "规范" / "编码规范.PDF").write_bytes(b"%PDF-1.4\x00\x01")
+        with mock.patch.object(doc_store, "read_text_file") as read:
+            result = doc_store.extract_checklist_from_document(self.temp_dir, "规范/编码规范.PDF")
+            read.assert_not_called()
+        self.assertIn(".pdf", result["error"])
+        self.assertIsNone(result["checklist"])
+
+    def test_search_rules_by_keyword(self):
+        """测试按关键词检索规则（不区分大小写，不跨字段匹配）"""
+        checklist = StandardChecklist()
+        checklist.add_rule(StandardRule("R1", "Use snake_case", "函数命名", ["Naming"]))
+        checklist.add_rule(StandardRule("R2", "缩进", "使用 4 个空格", ["indent"]))
+
+        self.assertEqual([r.rule_id for r in checklist.search_rules_by_keyword("SNAKE")], ["R1"])
+        self.assertEqual([r.rule_id for r in checklist.search_rules_by_keyword("naming")], ["R1"])
+        self.assertEqual([r.rule_id for r in checklist.search_rules_by_keyword("空格")], ["R2"])
+        self.assertEqual(checklist.search_rules_by_keyword("case函数"), [])
+
+    def test_checklist_severity_index(self):
+        """测试按严重级别索引规则，合并后统计保持一致"""
+        first = StandardChecklist()
+        first.add_rule(StandardRule("R1", "必须", "必须写注释", [], severity="error"))
+        first.add_rule(StandardRule("R2", "建议", "建议拆分函数", [], severity="warning"))
+        second = StandardChecklist()
+        second.add_rule(StandardRule("R3", "必须", "禁止硬编码", [], severity="error"))
+
+        first.merge(second)
+        self.assertEqual([r.rule_id for r in first.get_rules_by_severity("error")], ["R1", "R3"])
+        self.assertEqual(first.get_rules_by_severity("unknown"), [])
+        self.assertEqual(first.to_dict()["summary"]["by_severity"], {"error": 2, "warning": 1, "info": 0})
+
+    def test_locator_reuses_unchanged_documents(self):
+        """测试规范定位器重复构建时只重新解析有变化的文档"""
+        locator = doc_store.create_standard_locator(self.temp_dir)
+        docs = ["规范/命名规范.md", "规范/代码风格.md"]
+        first = locator.build_checklist(doc_paths=docs)
+
+        with mock.patch.object(
+            doc_store, "_extract_checklist", wraps=doc_store._extract_checklist
+        ) as spy:
+            again = locator.build_checklist(doc_paths=docs[:1])
+            self.assertEqual(spy.call_count, 0)
+
+            changed = Path(self.temp_dir) / docs[1]
+            changed.write_text("# 新规范\n- 必须使用 UTF-8 编码保存文件\n", encoding="utf-8")
+            os.utime(changed, ns=(0, 0))
+            rebuilt = locator.build_checklist(doc_paths=docs)
+            self.assertEqual(spy.call_count, 1)
+
+        self.assertEqual(again["total_rules"], first["processed_documents"][0]["rules_extracted"])
+        self.assertEqual(rebuilt["processed_documents"][1]["rules_extracted"], 1)
+
 
 class TestIntegrationSwitch(unittest.TestCase):
     """集成测试开关测试"""
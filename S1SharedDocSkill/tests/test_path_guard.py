@@ -125,6 +125,28 @@ class TestNormalizeAndValidatePath(unittest.TestCase):
         self.assertIsNotNone(result2)
 
 
+    def test_root_symlink_repointed(self):
+        """测试根目录符号链接改指后，校验按新目标进行（不沿用旧的解析结果）"""
+        for name in ("A", "B"):
+            os.mkdir(os.path.join(self.temp_dir, name))
+        Path(self.temp_dir, "A", "secret").write_text("s", encoding="utf-8")
+        Path(self.temp_dir, "B", "ok.txt").write_text("ok", encoding="utf-8")
+        root = os.path.join(self.temp_dir, "root")
+        try:
+            os.symlink(os.path.join(self.temp_dir, "A"), root)
+            os.symlink(os.path.join(self.temp_dir, "A", "secret"), os.path.join(self.temp_dir, "B", "esc"))
+        except (OSError, NotImplementedError):
+            self.skipTest("当前环境不支持创建符号链接")
+
+        normalize_and_validate_path(root, "secret")
+        os.remove(root)
+        os.symlink(os.path.join(self.temp_dir, "B"), root)
+
+        self.assertEqual(normalize_and_validate_path(root, "ok.txt"), Path(root, "ok.txt"))
+        with self.assertRaises(PathNotAllowedError):
+            normalize_and_validate_path(root, "esc")
+
+
 class TestSuggestParentPath(unittest.TestCase):
     """路径建议测试"""
 
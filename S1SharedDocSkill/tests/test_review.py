@@ -9,15 +9,26 @@
 """
 
 import os
+import shutil
 import sys
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 # 添加 src 目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from doc_store import DocStore
+import doc_store
+from doc_store import (
+    CodeReviewer,
+    DocStore,
+    FileReviewResult,
+    ReviewIssue,
+    ReviewReport,
+    StandardChecklist,
+    StandardRule,
+)
 
 
 class TestCodeReview(unittest.TestCase):
@@ -139,6 +150,107 @@ def calculate(n):
         summary = result["summary"]
         self.assertIn("total_issues", summary)
 
+    def test_review_session_reused(self):
+        """测试 review_code 复用会话，规范修改或失效后重新构建"""
+        self.addCleanup(doc_store.invalidate_review_session, self.temp_dir)
+        with mock.patch.object(
+            doc_store, "locate_standard_documents", wraps=doc_store.locate_standard_documents
+        ) as locate:
+            for _ in range(2):
+                self.assertTrue(self.store.review_code(snippet="x = 1")["success"])
+            self.assertEqual(locate.call_count, 1)
+
+            # 规范文档修改后，下次 Review 重新定位并构建检查清单
+            with open(Path(self.temp_dir) / "规范" / "命名规范.md", "a", encoding="utf-8") as f:
+                f.write("\n## 4. 常量命名\n- 常量必须使用全大写\n")
+            self.assertTrue(self.store.review_code(snippet="x = 1")["success"])
+            self.assertEqual(locate.call_count, 2)
+
+            doc_store.invalidate_review_session(self.temp_dir)
+            self.assertTrue(self.store.review_code(snippet="x = 1")["success"])
+            self.assertEqual(locate.call_count, 3)
+
+    def test_review_session_without_standards_not_cached(self):
+        """测试未找到规范时不缓存会话，之后新增的规范可被定位到"""
+        empty_dir = tempfile.mkdtemp(prefix="test_review_empty_")
+        self.addCleanup(shutil.rmtree, empty_dir, ignore_errors=True)
+        self.assertFalse(DocStore(root_dir=empty_dir).review_code(snippet="x = 1")["success"])
+
+        shutil.copytree(Path(self.temp_dir) / "规范", Path(empty_dir) / "规范")
+        self.addCleanup(doc_store.invalidate_review_session, empty_dir)
+        self.assertTrue(DocStore(root_dir=empty_dir).review_code(snippet="x = 1")["success"])
+
+
+class TestReviewResult(unittest.TestCase):
+    """Review 结果统计测试"""
+
+    def test_severity_counts(self):
+        """测试按严重级别统计问题数"""
+        result = FileReviewResult("a.py")
+        for severity in ("error", "warning", "warning", "info", "critical"):
+            result.add_issue(ReviewIssue("R", "t", severity, "d", "a.py"))
+        self.assertEqual((result.error_count, result.warning_count, result.info_count), (1, 2, 1))
+        self.assertTrue(result.has_blocking_issues)
+        self.assertFalse(FileReviewResult("b.py").has_blocking_issues)
+
+        # Markdown 按 error > warning > info > 其他 输出，同级保持添加顺序
+        ordered = FileReviewResult("c.py")
+        for rule_id, severity in (("A", "critical"), ("B", "info"), ("C", "minor"), ("D", "error"), ("E", "critical")):
+            ordered.add_issue(ReviewIssue(rule_id, "t", severity, "d", "c.py"))
+        text = ordered.format_markdown()
+        self.assertEqual(sorted("DBACE", key=lambda r: text.index(f"[{r}]")), list("DBACE"))
+
+        report = ReviewReport()
+        report.add_file_result(result)
+        report.add_file_result(FileReviewResult("b.py"))
+        summary = report.to_dict()["summary"]
+        self.assertEqual((summary["total_issues"], summary["errors"], summary["warnings"]), (5, 1, 2))
+        self.assertEqual(summary["verdict"], "BLOCKED")
+
+        # 分段输出拼接后与完整报告一致
+        self.assertEqual("".join(report.iter_markdown()), report.format_markdown())
+        empty = ReviewReport()
+        self.assertEqual("".join(empty.iter_markdown()), empty.format_markdown())
+
+
+class TestCodeReviewer(unittest.TestCase):
+    """基于检查清单的规则匹配测试"""
+
+    def _review(self, code):
+        checklist = StandardChecklist()
+        checklist.add_rule(StandardRule("R1", "禁止 eval", "禁止使用 eval", ["EVAL", "exec"], severity="error"))
+        checklist.add_rule(StandardRule(
+            "R2", "打印", "建议使用日志", ["print"], severity="warning", counter_examples=["print(x)"],
+        ))
+        checklist.add_rule(StandardRule("R3", "提示", "可以使用类型注解", ["def"], severity="info"))
+        return CodeReviewer("/nonexistent", checklist=checklist).review_code_snippet(code, "a.py")
+
+    def test_keyword_matches_dispatch_to_rules(self):
+        """测试关键词按行命中并分派给规则（有无 pyahocorasick 结果一致）"""
+        code = "def f(x):\n    print('start')\n    Eval(x)\n    print(x)\n    exec(x)\n"
+        expected = [("R1", 3), ("R2", 4)]
+        result = self._review(code)
+        self.assertEqual([(i.rule_id, i.line_start) for i in result.issues], expected)
+        with mock.patch.object(doc_store, "ahocorasick", None):
+            result = self._review(code)
+        self.assertEqual([(i.rule_id, i.line_start) for i in result.issues], expected)
+
+
+    def test_review_files_keeps_input_order(self):
+        """测试多文件并发 Review 后报告中的文件顺序与输入一致"""
+        temp_dir = tempfile.mkdtemp(prefix="test_review_files_")
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        names = [f"m{i}.py" for i in range(12)]
+        for i, name in enumerate(names):
+            Path(temp_dir, name).write_text("eval(x)\n" * (i % 3), encoding="utf-8")
+
+        checklist = StandardChecklist()
+        checklist.add_rule(StandardRule("R1", "禁止 eval", "禁止使用 eval", ["eval"], severity="error"))
+        report = CodeReviewer(temp_dir, checklist=checklist).review_files(names + ["missing.py"], temp_dir)
+
+        self.assertEqual([r.file_path for r in report.file_results], names + ["missing.py"])
+        self.assertEqual(report.total_errors, 8 + 1)
+
 
 class TestReviewIntegration(unittest.TestCase):
     """Review 集成测试"""